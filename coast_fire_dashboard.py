@@ -1,28 +1,68 @@
 # coast_fire_dashboard.py
 import math
-import pandas as pd
+import numpy as np
+import pyarrow as pa
 import streamlit as st
 
+from finance import money, pmt_to_reach_fv
+
 st.set_page_config(page_title="Coast FIRE Dashboard", page_icon="🏝️", layout="wide")
 
 # --- CSS to prevent metrics from truncating (the "$1,00..." issue) ---
-st.markdown(
-    """
-    <style>
-    [data-testid="stMetricValue"] {
-        white-space: nowrap !important;
-        overflow: visible !important;
-        text-overflow: clip !important;
-        font-size: 2.2rem !important;
-        line-height: 1.2 !important;
-    }
-    [data-testid="stMetricLabel"] {
-        white-space: nowrap !important;
-    }
-    </style>
-    """,
-    unsafe_allow_html=True,
-)
+_CSS = """
+<style>
+[data-testid="stMetricValue"] {
+    white-space: nowrap !important;
+    overflow: visible !important;
+    text-overflow: clip !important;
+    font-size: 2.2rem !important;
+    line-height: 1.2 !important;
+}
+[data-testid="stMetricLabel"] {
+    white-space: nowrap !important;
+}
+</style>
+"""
+
+# Chart spec; each run only passes in the current Arrow table as data.
+# Streamlit patches nested keys (e.g. encoding.color.title) in place, which is fine
+# here because the script body rebuilds this dict every run. If it is ever moved
+# to an imported module or shared, pass copy.deepcopy(_CHART_SPEC) instead.
+_CHART_SPEC = {
+    "transform": [
+        {
+            "fold": ["Portfolio (no contrib)", "Portfolio (with contrib)", "FIRE number"],
+            "as": ["Series", "Value"],
+        }
+    ],
+    "encoding": {
+        "x": {"field": "Age", "type": "quantitative"},
+        "y": {"field": "Value", "type": "quantitative", "title": None, "axis": {"format": "$,.0f"}},
+        "color": {"field": "Series", "type": "nominal", "title": None, "legend": {"orient": "bottom"}},
+        "tooltip": [
+            {"field": "Age", "type": "quantitative"},
+            {"field": "Series", "type": "nominal"},
+            {"field": "Value", "type": "quantitative", "format": "$,.0f"},
+        ],
+    },
+    "layer": [
+        {
+            "mark": "line",
+            "params": [{"name": "grid", "select": "interval", "bind": "scales"}],
+        },
+        # Hover point, matching what st.line_chart draws
+        {
+            "mark": {"type": "point", "filled": True, "size": 65},
+            "params": [
+                {
+                    "name": "hover",
+                    "select": {"type": "point", "on": "mouseover", "nearest": True, "clear": "mouseout"},
+                }
+            ],
+            "encoding": {"opacity": {"condition": {"param": "hover", "empty": False, "value": 1}, "value": 0}},
+        },
+    ],
+}
 
 st.title("🏝️ Coast FIRE Dashboard")
 st.caption(
@@ -30,38 +70,40 @@ st.caption(
 )
 
 # ---------- Helpers ----------
-def money(x: float) -> str:
-    if x is None or math.isinf(x) or math.isnan(x):
-        return "—"
-    return f"${x:,.0f}"
-
-def fv_lump_sum(pv: float, r: float, n: int) -> float:
-    return pv * ((1 + r) ** n)
-
-def fv_with_contrib_annual(pv: float, r: float, n: int, annual_contrib: float) -> float:
-    """Future value assuming contributions are made at end of each year."""
-    if n <= 0:
-        return pv
+def validate(current_age: int, retire_age: int, swr_pct: float) -> list[str]:
+    """All input errors at once, so invalid reruns stop before any math or rendering."""
+    errors = []
+    if retire_age <= current_age:
+        errors.append("Retirement age must be greater than current age.")
+    if swr_pct <= 0:
+        errors.append("Safe withdrawal rate must be greater than 0.")
+    return errors
+
+@st.cache_data(ttl=None, max_entries=128)
+def compute_projection(
+    current_portfolio: float,
+    r: float,
+    years_to_retire: int,
+    annual_contrib: float,
+    fire_number: float,
+    current_age: int,
+) -> pa.Table:
+    """Year-by-year portfolio (no contrib vs with contrib) against the FIRE number, by age."""
+    years = np.arange(years_to_retire + 1, dtype=np.float64)
+    growth = np.exp(math.log1p(r) * years)
+
+    ages_arr = np.arange(current_age, current_age + years_to_retire + 1, dtype=np.int16)
+    no_contrib_arr = current_portfolio * growth
     if abs(r) < 1e-12:
-        return pv + annual_contrib * n
-    annuity_factor = (((1 + r) ** n) - 1) / r
-    return pv * ((1 + r) ** n) + annual_contrib * annuity_factor
-
-def pmt_to_reach_fv(pv: float, r: float, n: int, fv_target: float) -> float:
-    """Annual contribution needed (end of year) to reach fv_target in n years."""
-    if n <= 0:
-        return 0.0 if pv >= fv_target else float("inf")
-    if abs(r) < 1e-12:
-        needed = max(0.0, fv_target - pv)
-        return needed / n
-
-    growth_pv = pv * ((1 + r) ** n)
-    remaining = fv_target - growth_pv
-    if remaining <= 0:
-        return 0.0
+        with_contrib_arr = current_portfolio + annual_contrib * years
+    else:
+        with_contrib_arr = current_portfolio * growth + annual_contrib * (growth - 1.0) / r
+    fire_arr = np.full(len(ages_arr), fire_number, dtype=np.float64)
 
-    annuity_factor = (((1 + r) ** n) - 1) / r
-    return remaining / annuity_factor
+    return pa.Table.from_arrays(
+        [pa.array(ages_arr), pa.array(no_contrib_arr), pa.array(with_contrib_arr), pa.array(fire_arr)],
+        names=["Age", "Portfolio (no contrib)", "Portfolio (with contrib)", "FIRE number"],
+    )
 
 # ---------- Sidebar Inputs ----------
 with st.sidebar:
@@ -130,34 +172,66 @@ with st.sidebar:
     )
 
 # ---------- Guardrails ----------
-if retire_age <= current_age:
-    st.error("Retirement age must be greater than current age.")
+errors = validate(current_age, retire_age, swr_pct)
+if errors:
+    for msg in errors:
+        st.error(msg)
     st.stop()
 
 years_to_retire = int(retire_age - current_age)
 swr = swr_pct / 100.0
 
-if swr <= 0:
-    st.error("Safe withdrawal rate must be greater than 0.")
-    st.stop()
+# Injected on every run: Streamlit drops elements that a rerun doesn't re-emit,
+# so gating this behind session_state would strip the styling after the first rerun.
+st.markdown(_CSS, unsafe_allow_html=True)
 
 # ---------- Core Calculations ----------
-fire_number = annual_spending / swr
-fv_if_coast_now = fv_lump_sum(current_portfolio, r, years_to_retire)
-required_today_for_coast = fire_number / ((1 + r) ** years_to_retire)
-
-coast_now = fv_if_coast_now >= fire_number
-gap = fire_number - fv_if_coast_now
-
-# Coast-by-age target
-years_to_coast = int(max(0, coast_age - current_age))
-years_from_coast_to_retire = int(max(0, retire_age - coast_age))
-required_at_coast_age = (
-    fire_number / ((1 + r) ** years_from_coast_to_retire) if years_from_coast_to_retire > 0 else fire_number
-)
-annual_needed_to_hit_coast_by_coast_age = (
-    pmt_to_reach_fv(current_portfolio, r, years_to_coast, required_at_coast_age) if years_to_coast > 0 else None
-)
+# Reruns triggered without an input change (layout resizes, re-clicks) reuse the last results.
+inputs_key = (current_age, retire_age, coast_age, current_portfolio, annual_spending, swr_pct, r, annual_contrib)
+if st.session_state.get("_inputs_key") != inputs_key:
+    fire_number = annual_spending / swr
+    log1pr = math.log1p(r)
+    growth_to_retire = math.exp(log1pr * years_to_retire)
+    fv_if_coast_now = current_portfolio * growth_to_retire
+    required_today_for_coast = fire_number / growth_to_retire
+
+    coast_now = fv_if_coast_now >= fire_number
+    gap = fire_number - fv_if_coast_now
+
+    # Coast-by-age target
+    years_to_coast = int(max(0, coast_age - current_age))
+    years_from_coast_to_retire = int(max(0, retire_age - coast_age))
+    growth_coast_to_retire = math.exp(log1pr * years_from_coast_to_retire)
+    required_at_coast_age = fire_number / growth_coast_to_retire
+    annual_needed_to_hit_coast_by_coast_age = (
+        pmt_to_reach_fv(current_portfolio, r, years_to_coast, required_at_coast_age) if years_to_coast > 0 else None
+    )
+    chart_df = compute_projection(current_portfolio, r, years_to_retire, annual_contrib, fire_number, current_age)
+
+    st.session_state["_results"] = (
+        fire_number,
+        fv_if_coast_now,
+        required_today_for_coast,
+        coast_now,
+        gap,
+        years_to_coast,
+        required_at_coast_age,
+        annual_needed_to_hit_coast_by_coast_age,
+        chart_df,
+    )
+    st.session_state["_inputs_key"] = inputs_key
+
+(
+    fire_number,
+    fv_if_coast_now,
+    required_today_for_coast,
+    coast_now,
+    gap,
+    years_to_coast,
+    required_at_coast_age,
+    annual_needed_to_hit_coast_by_coast_age,
+    chart_df,
+) = st.session_state["_results"]
 
 # ---------- Layout ----------
 left, right = st.columns([1.25, 1])
@@ -207,23 +281,7 @@ with right:
 st.divider()
 st.subheader("📈 Compound growth (portfolio over time)")
 
-years = list(range(0, years_to_retire + 1))
-ages = [current_age + y for y in years]
-
-no_contrib_series = [fv_lump_sum(current_portfolio, r, y) for y in years]
-with_contrib_series = [fv_with_contrib_annual(current_portfolio, r, y, annual_contrib) for y in years]
-fire_line = [fire_number for _ in years]
-
-chart_df = pd.DataFrame(
-    {
-        "Age": ages,
-        "Portfolio (no contrib)": [round(x, 0) for x in no_contrib_series],
-        "Portfolio (with contrib)": [round(x, 0) for x in with_contrib_series],
-        "FIRE number": [round(x, 0) for x in fire_line],
-    }
-).set_index("Age")
-
-st.line_chart(chart_df, use_container_width=True)
+st.vega_lite_chart(chart_df, _CHART_SPEC, use_container_width=True)
 
 st.caption(
     "This chart is deterministic and based on your inputs (real return assumption). Markets vary — use this as a planning estimate, not a guarantee."
@@ -0,0 +1,67 @@
+# finance.py
+import math
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:  # numba is optional; fall back to plain Python
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda fn: fn
+
+    prange = range
+
+# ---------- Helpers ----------
+def money(x: float) -> str:
+    if x is None or math.isinf(x) or math.isnan(x):
+        return "—"
+    return f"${x:,.0f}"
+
+def fv_lump_sum(pv: float, r: float, n: int) -> float:
+    return pv * ((1 + r) ** n)
+
+@njit("float64(float64, float64, int64, float64)", cache=True)
+def fv_with_contrib_annual(pv: float, r: float, n: int, annual_contrib: float) -> float:
+    """Future value assuming contributions are made at end of each year."""
+    if n <= 0:
+        return pv
+    if abs(r) < 1e-12:
+        return pv + annual_contrib * n
+    annuity_factor = (((1 + r) ** n) - 1) / r
+    return pv * ((1 + r) ** n) + annual_contrib * annuity_factor
+
+@njit("float64(float64, float64, int64, float64)", cache=True)
+def pmt_to_reach_fv(pv: float, r: float, n: int, fv_target: float) -> float:
+    """Annual contribution needed (end of year) to reach fv_target in n years."""
+    if n <= 0:
+        return 0.0 if pv >= fv_target else float("inf")
+    if abs(r) < 1e-12:
+        needed = max(0.0, fv_target - pv)
+        return needed / n
+
+    growth_pv = pv * ((1 + r) ** n)
+    remaining = fv_target - growth_pv
+    if remaining <= 0:
+        return 0.0
+
+    annuity_factor = (((1 + r) ** n) - 1) / r
+    return remaining / annuity_factor
+
+@njit(parallel=True, cache=True)
+def pmt_to_reach_fv_grid(pv: float, r_grid: np.ndarray, n: int, fv_target: float) -> np.ndarray:
+    """pmt_to_reach_fv evaluated across a grid of annual returns."""
+    out = np.empty(len(r_grid))
+    for i in prange(len(r_grid)):
+        out[i] = pmt_to_reach_fv(pv, r_grid[i], n, fv_target)
+    return out
+
+def pmt_to_reach_fv_vec(pv, r, n, fv_target) -> np.ndarray:
+    """Array version of pmt_to_reach_fv; broadcasts over its inputs with no per-element branches."""
+    r = np.asarray(r, dtype=np.float64)
+    n = np.asarray(n, dtype=np.float64)
+    growth = (1.0 + r) ** n
+    with np.errstate(divide="ignore", invalid="ignore"):
+        annuity_factor = np.where(np.abs(r) < 1e-12, n, (growth - 1.0) / np.where(r == 0, 1.0, r))
+        remaining = np.maximum(0.0, fv_target - pv * growth)
+        return np.where(n <= 0, np.where(pv >= fv_target, 0.0, np.inf), remaining / annuity_factor)